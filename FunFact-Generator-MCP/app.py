@@ -1,11 +1,22 @@
 import streamlit as st
 import requests
 import time
+import os
+import sys
 from datetime import datetime
 
+# Shared client library lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cached_client import CachedClient
+
 # Configuration
 MCP_SERVER_URL = "http://localhost:8000"
 
+@st.cache_resource(show_spinner=False)
+def get_client():
+    # One pooled session + response cache shared across reruns and sessions
+    return CachedClient(MCP_SERVER_URL)
+
 # Initialize session state
 if 'favorites' not in st.session_state:
     st.session_state.favorites = []
@@ -25,6 +36,8 @@ st.set_page_config(
     layout="centered"
 )
 
+client = get_client()
+
 st.title("🔍 Amazing Fact Generator")
 st.caption("Powered by MCP Server • Learn something new every time")
 
@@ -32,17 +45,19 @@ st.caption("Powered by MCP Server • Learn something new every time")
 with st.sidebar:
     st.header("Settings")
     
-    # Get available categories
+    # Check the server; /health is sent with no-cache, so this always reaches it
     try:
-        response = requests.get(f"{MCP_SERVER_URL}/categories", timeout=5)
-        if response.status_code == 200:
-            categories = response.json().get("categories", ["random"])
-            st.session_state.server_status = "online"
-        else:
-            st.session_state.server_status = "unstable"
-            categories = ["science", "history", "animal", "random"]
+        client.get_json("/health", timeout=5)
+        st.session_state.server_status = "online"
+    except requests.exceptions.HTTPError:
+        st.session_state.server_status = "unstable"
     except:
         st.session_state.server_status = "offline"
+
+    # Get available categories (served from the local cache while fresh)
+    try:
+        categories = client.get_json("/categories", timeout=5).get("categories", ["random"])
+    except:
         categories = ["science", "history", "animal", "random"]
     
     # Status display
@@ -93,8 +108,8 @@ def generate_fact():
     try:
         status_placeholder.info("🔍 Discovering a new fact...")
         
-        response = requests.post(
-            f"{MCP_SERVER_URL}/generate",
+        response = client.post(
+            "/generate",
             json={
                 "category": category,
                 "exclude_facts": list(st.session_state.seen_facts)
@@ -1,11 +1,17 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import requests
 import random
 import logging
+import os
+import sys
 from datetime import datetime, timedelta
 
+# Shared modules live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from response_caching import conditional_json_response, json_response, precomputed_response
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,7 +31,7 @@ class FactRequest(BaseModel):
     category: str = "random"
     exclude_facts: list[str] = []  # To avoid repeats
 
-# Free fact API endpoints and local database fallback
+# Free fact API endpoints and built-in local facts (used when no packed corpus is installed)
 FACT_SOURCES = {
     "science": [
         {"type": "api", "url": "https://science-facts.herokuapp.com/api/v1/facts/random"},
@@ -53,17 +59,34 @@ FACT_SOURCES = {
     ],
     "random": [
         {"type": "api", "url": "https://uselessfacts.jsph.pl/random.json?language=en"},
-        {"type": "local", "facts": []}  # Will be filled from other categories
+        {"type": "local", "facts": []}  # Sampled across all other categories
     ]
 }
 
-# Initialize random category with all facts
-all_facts = []
-for category in ["science", "history", "animal"]:
-    for source in FACT_SOURCES[category]:
-        if source["type"] == "local":
-            all_facts.extend(source["facts"])
-FACT_SOURCES["random"][1]["facts"] = all_facts
+# Packed corpus of curated facts, memory-mapped so its size doesn't affect startup.
+# Build one with: python packed_corpus.py pack facts.jsonl facts.corpus
+FACT_CORPUS_PATH = os.environ.get(
+    "FACT_CORPUS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "facts.corpus")
+)
+LOCAL_SAMPLE_SIZE = 20  # Local facts mixed into each cache refresh
+
+local_corpus = None
+if os.path.exists(FACT_CORPUS_PATH):
+    # Only needed when a corpus is installed
+    from packed_corpus import open_corpus
+    local_corpus = open_corpus(FACT_CORPUS_PATH)
+
+def sample_local_facts(category, count):
+    """Draw up to count distinct local facts, from the packed corpus when one is loaded"""
+    if local_corpus is not None:
+        facts = local_corpus.sample_distinct(None if category == "random" else category, count)
+        if facts:
+            return facts
+    # Built-in facts; "random" draws from every category
+    categories = FACT_SOURCES if category == "random" else [category]
+    facts = [fact for name in categories for source in FACT_SOURCES[name]
+             if source["type"] == "local" for fact in source["facts"]]
+    return random.sample(facts, min(count, len(facts)))
 
 # Cache to avoid hitting rate limits
 fact_cache = {
@@ -75,8 +98,16 @@ fact_cache = {
 
 CACHE_EXPIRY = timedelta(minutes=30)
 
+# Serialized bodies (and their ETags) for the read-only routes, rebuilt lazily
+# whenever the fact cache changes
+response_cache = {}
+
+def invalidate_responses():
+    """Drop precomputed bodies that depend on the fact cache"""
+    response_cache.pop("health", None)
+
 def fetch_facts_from_source(category):
-    """Fetch facts from APIs and combine with local facts"""
+    """Fetch facts from APIs and combine with a sample of local facts"""
     try:
         facts = []
         
@@ -98,13 +129,12 @@ def fetch_facts_from_source(category):
                     logger.warning(f"Failed to fetch from {source['url']}: {str(e)}")
         
         # Add local facts
-        for source in FACT_SOURCES[category]:
-            if source["type"] == "local":
-                facts.extend(source["facts"])
+        facts.extend(sample_local_facts(category, LOCAL_SAMPLE_SIZE))
         
         if facts:
             fact_cache[category]["facts"] = facts
             fact_cache[category]["last_updated"] = datetime.now()
+            invalidate_responses()
             return facts
         return None
     except Exception as e:
@@ -119,20 +149,34 @@ def get_fresh_fact(category, exclude_list):
         len(fact_cache[category]["facts"]) < 3):
         fetch_facts_from_source(category)
     
-    available_facts = [f for f in fact_cache[category]["facts"] if f not in exclude_list]
+    exclude = set(exclude_list)
+    available_facts = [f for f in fact_cache[category]["facts"] if f not in exclude]
     
+    if not available_facts:
+        # Draw more from the local corpus before repeating anything
+        available_facts = [f for f in sample_local_facts(category, LOCAL_SAMPLE_SIZE) if f not in exclude]
+
     if not available_facts:
         available_facts = fact_cache[category]["facts"]  # Fallback to possibly repeated facts
     
     return random.choice(available_facts) if available_facts else "The human brain is the only object that can contemplate itself."
 
+CATEGORIES_CACHE_CONTROL = f"max-age={int(CACHE_EXPIRY.total_seconds())}"
+
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy", "cache_counts": {k: len(v["facts"]) for k, v in fact_cache.items()}}
+async def health_check(request: Request):
+    def build_payload():
+        return {"status": "healthy", "cache_counts": {k: len(v["facts"]) for k, v in fact_cache.items()}}
+    # cache_counts can change at any time (e.g. an early refresh of a short
+    # category), so clients must revalidate on every use
+    body, etag = precomputed_response(response_cache, "health", build_payload)
+    return conditional_json_response(request, body, etag, "no-cache")
 
 @app.get("/categories")
-async def get_categories():
-    return {"categories": list(FACT_SOURCES.keys())}
+async def get_categories(request: Request):
+    # The category list is static, so it only needs revalidating once per cache cycle
+    body, etag = precomputed_response(response_cache, "categories", lambda: {"categories": list(FACT_SOURCES.keys())})
+    return conditional_json_response(request, body, etag, CATEGORIES_CACHE_CONTROL)
 
 @app.post("/generate")
 async def generate_fact(request: FactRequest):
@@ -140,17 +184,17 @@ async def generate_fact(request: FactRequest):
         category = request.category if request.category in FACT_SOURCES else "random"
         fact = get_fresh_fact(category, request.exclude_facts)
         
-        return {
+        return json_response({
             "success": True,
             "fact": fact,
             "category": category
-        }
+        })
     except Exception as e:
-        return {
+        return json_response({
             "success": False,
             "error": str(e),
             "fallback": "Honey never spoils. Archaeologists have found pots of honey in ancient Egyptian tombs that are over 3,000 years old and still perfectly good to eat."
-        }
+        })
 
 if __name__ == "__main__":
     import uvicorn
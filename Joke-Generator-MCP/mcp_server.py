@@ -1,11 +1,17 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import requests
 import random
 import logging
+import os
+import sys
 from datetime import datetime, timedelta
 
+# Shared modules live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from response_caching import conditional_json_response, json_response, precomputed_response
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -45,6 +51,25 @@ JOKE_APIS = {
     ]
 }
 
+# Packed corpus of curated jokes, memory-mapped so its size doesn't affect startup.
+# Build one with: python packed_corpus.py pack jokes.jsonl jokes.corpus
+JOKE_CORPUS_PATH = os.environ.get(
+    "JOKE_CORPUS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "jokes.corpus")
+)
+LOCAL_SAMPLE_SIZE = 20  # Local jokes mixed into each cache refresh
+
+local_corpus = None
+if os.path.exists(JOKE_CORPUS_PATH):
+    # Only needed when a corpus is installed
+    from packed_corpus import open_corpus
+    local_corpus = open_corpus(JOKE_CORPUS_PATH)
+
+def sample_local_jokes(category, count):
+    """Draw up to count distinct jokes from the packed corpus, if one is loaded"""
+    if local_corpus is None:
+        return []
+    return local_corpus.sample_distinct(None if category == "random" else category, count)
+
 # Cache to avoid hitting rate limits
 joke_cache = {
     "general": {"jokes": [], "last_updated": None},
@@ -55,8 +80,16 @@ joke_cache = {
 
 CACHE_EXPIRY = timedelta(minutes=30)
 
+# Serialized bodies (and their ETags) for the read-only routes, rebuilt lazily
+# whenever the joke cache changes
+response_cache = {}
+
+def invalidate_responses():
+    """Drop precomputed bodies that depend on the joke cache"""
+    response_cache.pop("health", None)
+
 def fetch_jokes_from_api(category):
-    """Fetch multiple jokes from free APIs and cache them"""
+    """Fetch multiple jokes from free APIs, top up with local jokes and cache them"""
     try:
         jokes = []
         for api_url in JOKE_APIS[category]:
@@ -77,9 +110,12 @@ def fetch_jokes_from_api(category):
             except Exception as e:
                 logger.warning(f"Failed to fetch from {api_url}: {str(e)}")
         
+        jokes.extend(sample_local_jokes(category, LOCAL_SAMPLE_SIZE))
+        
         if jokes:
             joke_cache[category]["jokes"] = jokes
             joke_cache[category]["last_updated"] = datetime.now()
+            invalidate_responses()
             return jokes
         return None
     except Exception as e:
@@ -94,20 +130,34 @@ def get_fresh_joke(category, exclude_list):
         len(joke_cache[category]["jokes"]) < 3):
         fetch_jokes_from_api(category)
     
-    available_jokes = [j for j in joke_cache[category]["jokes"] if j not in exclude_list]
+    exclude = set(exclude_list)
+    available_jokes = [j for j in joke_cache[category]["jokes"] if j not in exclude]
     
+    if not available_jokes:
+        # Draw more from the local corpus before repeating anything
+        available_jokes = [j for j in sample_local_jokes(category, LOCAL_SAMPLE_SIZE) if j not in exclude]
+
     if not available_jokes:
         available_jokes = joke_cache[category]["jokes"]  # Fallback to possibly repeated jokes
     
     return random.choice(available_jokes) if available_jokes else "Why did the developer go broke? Because he used up all his cache!"
 
+CATEGORIES_CACHE_CONTROL = f"max-age={int(CACHE_EXPIRY.total_seconds())}"
+
 @app.get("/health")
-async def health_check():
-    return {"status": "healthy", "cache_counts": {k: len(v["jokes"]) for k, v in joke_cache.items()}}
+async def health_check(request: Request):
+    def build_payload():
+        return {"status": "healthy", "cache_counts": {k: len(v["jokes"]) for k, v in joke_cache.items()}}
+    # cache_counts can change at any time (e.g. an early refresh of a short
+    # category), so clients must revalidate on every use
+    body, etag = precomputed_response(response_cache, "health", build_payload)
+    return conditional_json_response(request, body, etag, "no-cache")
 
 @app.get("/categories")
-async def get_categories():
-    return {"categories": list(JOKE_APIS.keys())}
+async def get_categories(request: Request):
+    # The category list is static, so it only needs revalidating once per cache cycle
+    body, etag = precomputed_response(response_cache, "categories", lambda: {"categories": list(JOKE_APIS.keys())})
+    return conditional_json_response(request, body, etag, CATEGORIES_CACHE_CONTROL)
 
 @app.post("/generate")
 async def generate_joke(request: JokeRequest):
@@ -115,17 +165,17 @@ async def generate_joke(request: JokeRequest):
         category = request.category if request.category in JOKE_APIS else "random"
         joke = get_fresh_joke(category, request.exclude_jokes)
         
-        return {
+        return json_response({
             "success": True,
             "joke": joke,
             "category": category
-        }
+        })
     except Exception as e:
-        return {
+        return json_response({
             "success": False,
             "error": str(e),
             "fallback": "Why don't scientists trust atoms? Because they make up everything!"
-        }
+        })
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,10 +1,23 @@
 import streamlit as st
 import requests
+import os
+import sys
+
+# Shared client library lives at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cached_client import CachedClient
 
 BASE_URL = "http://127.0.0.1:8000"  # Update if hosted elsewhere
 
+@st.cache_resource(show_spinner=False)
+def get_client():
+    # One pooled session + response cache shared across reruns and sessions
+    return CachedClient(BASE_URL, timeout=10)
+
 st.set_page_config(page_title="Weather UI", page_icon="⛅", layout="centered")
 
+client = get_client()
+
 st.title("🌤️ Weather Report")
 
 city = st.text_input("Enter city name", placeholder="e.g. London")
@@ -15,16 +28,14 @@ if st.button("Get Weather"):
     else:
         with st.spinner("Fetching weather..."):
             try:
-                response = requests.get(f"{BASE_URL}/weather", params={"city": city})
-                if response.status_code == 200:
-                    data = response.json()
-                    if "error" in data:
-                        st.error(f"Error: {data['error']}")
-                    else:
-                        st.success(f"Weather in {data['city']}")
-                        st.metric(label="🌡️ Temperature", value=f"{data['temperature_C']} °C")
-                        st.write(f"🌥️ Condition: {data['weather'].title()}")
+                data = client.get_json("/weather", params={"city": city.strip()})
+                if "error" in data:
+                    st.error(f"Error: {data['error']}")
                 else:
-                    st.error(f"Request failed with status code {response.status_code}")
+                    st.success(f"Weather in {data['city']}")
+                    st.metric(label="🌡️ Temperature", value=f"{data['temperature_C']} °C")
+                    st.write(f"🌥️ Condition: {data['weather'].title()}")
+            except requests.exceptions.HTTPError as e:
+                st.error(f"Request failed with status code {e.response.status_code}")
             except Exception as e:
                 st.error(f"Something went wrong: {e}")
@@ -1,10 +1,23 @@
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import requests
+import os
+import sys
+from datetime import datetime, timedelta
 from mcp.server.fastmcp import FastMCP
 
+# Shared modules live at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from response_caching import conditional_json_response, dumps, etag_for, json_response
+
 app = FastAPI()
 
+# Weather changes slowly enough that a short-lived per-city cache is safe
+CACHE_EXPIRY = timedelta(minutes=10)
+# /weather is public, so bound how many cities one client can make us remember
+MAX_CACHED_CITIES = 1000
+
 # ---- MCP-like model agent ----
 
 class WeatherAgent:
@@ -18,15 +31,15 @@ class WeatherAgent:
 
     def get_weather(self, city: str) -> dict:
         """Fetch weather data from OpenWeatherMap."""
-        url = (
-            f"https://api.openweathermap.org/data/2.5/weather?"
-            f"q={city}&appid={self.api_key}&units=metric"
+        response = requests.get(
+            "https://api.openweathermap.org/data/2.5/weather",
+            params={"q": city, "appid": self.api_key, "units": "metric"},
         )
-        response = requests.get(url)
         response.raise_for_status()
         data = response.json()
         return {
-            "city": city,
+            # OpenWeatherMap's own spelling of the place, e.g. "Winston-Salem"
+            "city": data.get("name") or city,
             "temperature_C": data["main"]["temp"],
             "weather": data["weather"][0]["description"]
         }
@@ -36,13 +49,70 @@ class WeatherAgent:
 class WeatherMCP:
     """
     Orchestrator that holds model context and routes.
+    Recent results are kept per city, already serialized, so repeat lookups
+    don't hit the API or the JSON encoder.
     """
 
     def __init__(self, agent: WeatherAgent):
         self.agent = agent
+        self.cache = {}  # cache key -> {"data", "body", "etag", "last_updated"}
+
+    @staticmethod
+    def cache_key(city: str) -> str:
+        """Case-folded, whitespace-collapsed form so spellings of one city share an entry"""
+        return " ".join(city.split()).casefold()
+
+    def _fresh_entry(self, city: str):
+        entry = self.cache.get(self.cache_key(city))
+        if entry is None or datetime.now() - entry["last_updated"] > CACHE_EXPIRY:
+            return None
+        return entry
+
+    def _cache_entry(self, city: str) -> dict:
+        entry = self._fresh_entry(city)
+        if entry is None:
+            data = self.agent.get_weather(city.strip())
+            body = dumps(data)
+            entry = {
+                "data": data,
+                "body": body,
+                "etag": etag_for(body),
+                "last_updated": datetime.now(),
+            }
+            self._store(self.cache_key(city), entry)
+        return entry
+
+    def _store(self, key: str, entry: dict):
+        """Insert entry, dropping expired cities and then the oldest ones to stay within MAX_CACHED_CITIES"""
+        self.cache.pop(key, None)
+        if len(self.cache) >= MAX_CACHED_CITIES:
+            now = datetime.now()
+            for stale in [k for k, v in self.cache.items() if now - v["last_updated"] > CACHE_EXPIRY]:
+                del self.cache[stale]
+        while len(self.cache) >= MAX_CACHED_CITIES:
+            self.cache.pop(next(iter(self.cache)))  # Oldest entry first
+        self.cache[key] = entry
 
     def handle_weather_request(self, city: str) -> dict:
-        return self.agent.get_weather(city)
+        return self._cache_entry(city)["data"]
+
+    def handle_weather_response(self, city: str) -> tuple:
+        """Return the precomputed (body, etag) for city"""
+        entry = self._cache_entry(city)
+        return entry["body"], entry["etag"]
+
+    def cached_weather_response(self, city: str):
+        """Like handle_weather_response, but None instead of fetching on a cache miss"""
+        entry = self._fresh_entry(city)
+        return None if entry is None else (entry["body"], entry["etag"])
+
+    def cache_max_age(self, city: str) -> int:
+        """Seconds until the cached result for city goes stale"""
+        entry = self.cache.get(self.cache_key(city))
+        if entry is None:
+            return 0
+        remaining = (entry["last_updated"] + CACHE_EXPIRY - datetime.now()).total_seconds()
+        return max(0, int(remaining))
 
 # ---- Instantiate MCP ----
 
@@ -53,12 +123,17 @@ mcp = WeatherMCP(agent=weather_agent)
 # ---- API route ----
 
 @app.get("/weather")
-def get_weather(city: str = Query(..., description="City name")):
+async def get_weather(request: Request, city: str = Query(..., description="City name")):
     """
     Example: GET /weather?city=London
     """
     try:
-        result = mcp.handle_weather_request(city)
-        return result
+        # Cache hits are served straight from the event loop; only the
+        # blocking upstream fetch is pushed to the threadpool
+        cached = mcp.cached_weather_response(city)
+        if cached is None:
+            cached = await run_in_threadpool(mcp.handle_weather_response, city)
+        body, etag = cached
+        return conditional_json_response(request, body, etag, f"max-age={mcp.cache_max_age(city)}")
     except Exception as e:
-        return {"error": str(e)}
+        return json_response({"error": str(e)})
@@ -0,0 +1,203 @@
+"""
+Requests per second per core for the hot routes of the joke, fact and weather servers.
+
+Compares the working tree ("after") against a git ref ("before"). Pass the
+commit just before the change being measured, otherwise the numbers mix in
+(or miss) unrelated commits:
+
+    python benchmarks/bench_routes.py --before <commit-before-change>
+
+Requests are driven straight through each ASGI app in a single thread, so the
+numbers measure routing + handler + serialization cost and not the network.
+The "before" ref is extracted as a whole tree, and each version runs in its own
+subprocess, so shared modules (response_caching.py, packed_corpus.py) are
+always the ones from that version.
+Upstream APIs are never called: caches are pre-filled and the weather agent is
+replaced with a canned response.
+"""
+import argparse
+import asyncio
+import importlib.util
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_TEXTS = [f"Sample entry number {i} used to fill the server cache." for i in range(50)]
+
+APPS = {
+    "joke": {
+        "path": "Joke-Generator-MCP/mcp_server.py",
+        "cache": "joke_cache",
+        "items": "jokes",
+        "routes": [
+            ("GET", "/categories", b"", None),
+            ("GET", "/health", b"", None),
+            ("POST", "/generate", b"", {"category": "dad", "exclude_jokes": SAMPLE_TEXTS[:5]}),
+        ],
+    },
+    "fact": {
+        "path": "FunFact-Generator-MCP/mcp_server.py",
+        "cache": "fact_cache",
+        "items": "facts",
+        "routes": [
+            ("GET", "/categories", b"", None),
+            ("GET", "/health", b"", None),
+            ("POST", "/generate", b"", {"category": "science", "exclude_facts": SAMPLE_TEXTS[:5]}),
+        ],
+    },
+    "weather": {
+        "path": "WeatherApp-Report-MCP/weather_server.py",
+        "routes": [
+            ("GET", "/weather", b"city=London", None),
+        ],
+    },
+}
+
+
+def load_server(app_name, root):
+    """Import one server from the tree at root (run inside a worker process)"""
+    sys.path.insert(0, root)
+    path = os.path.join(root, APPS[app_name]["path"])
+    spec = importlib.util.spec_from_file_location(f"bench_{app_name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    logging.getLogger().setLevel(logging.WARNING)
+    prepare(app_name, module)
+    return module
+
+
+def extract_ref(ref, workdir):
+    """Write the whole tree at ref into workdir and return its path"""
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", ref],
+        cwd=REPO_ROOT, check=True, capture_output=True,
+    ).stdout
+    root = os.path.join(workdir, "before")
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(root)
+    return root
+
+
+def run_worker(root, app_name, requests_count):
+    """Benchmark one server version in a fresh interpreter; returns per-route req/s/core or a skip reason"""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", root,
+         "--apps", app_name, "--requests", str(requests_count)],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{app_name} worker for {root} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def worker(root, app_name, requests_count):
+    try:
+        module = load_server(app_name, root)
+    except ImportError as e:
+        print(json.dumps({"skipped": str(e)}))
+        return
+    rates = [
+        asyncio.run(measure(module.app, method, path, query, payload, requests_count))
+        for method, path, query, payload in APPS[app_name]["routes"]
+    ]
+    print(json.dumps({"rates": rates}))
+
+
+def prepare(app_name, module):
+    """Make every route answerable without touching the network"""
+    if app_name == "weather":
+        module.mcp.agent.get_weather = lambda city: {
+            "city": city, "temperature_C": 18.5, "weather": "scattered clouds"
+        }
+        return
+    config = APPS[app_name]
+    cache = getattr(module, config["cache"])
+    for entry in cache.values():
+        entry[config["items"]] = list(SAMPLE_TEXTS)
+        entry["last_updated"] = datetime.now()
+    if hasattr(module, "invalidate_responses"):
+        module.invalidate_responses()
+
+
+async def call(app, method, path, query, body):
+    """Send one request through an ASGI app and return the status code"""
+    headers = [(b"host", b"bench")]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query, "root_path": "", "headers": headers,
+        "client": ("127.0.0.1", 12345), "server": ("bench", 80),
+    }
+    sent = False
+    status = None
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(app, method, path, query, payload, requests_count):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    for _ in range(min(200, requests_count)):  # Warm up
+        status = await call(app, method, path, query, body)
+    if status != 200:
+        raise RuntimeError(f"{method} {path} returned {status}")
+    cpu_start = time.process_time()
+    for _ in range(requests_count):
+        await call(app, method, path, query, body)
+    cpu = time.process_time() - cpu_start
+    return requests_count / cpu if cpu else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--before", help="git ref to compare against, e.g. the commit before the change")
+    parser.add_argument("--requests", type=int, default=5000, help="requests per route (default: 5000)")
+    parser.add_argument("--apps", nargs="+", choices=list(APPS), default=list(APPS))
+    parser.add_argument("--worker", metavar="ROOT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        worker(args.worker, args.apps[0], args.requests)
+        return
+    if args.before is None:
+        parser.error("the following arguments are required: --before")
+
+    print(f"{'route':<28}{'before req/s/core':>20}{'after req/s/core':>20}{'speedup':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        before_root = extract_ref(args.before, workdir)
+        for app_name in args.apps:
+            before, after = (run_worker(root, app_name, args.requests) for root in (before_root, REPO_ROOT))
+            skipped = before.get("skipped") or after.get("skipped")
+            if skipped:
+                print(f"{app_name}: skipped ({skipped})")
+                continue
+            for (method, path, _, _), old, new in zip(APPS[app_name]["routes"], before["rates"], after["rates"]):
+                label = f"{app_name} {method} {path}"
+                print(f"{label:<28}{old:>20,.0f}{new:>20,.0f}{new / old:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class CachedClient:
+    """
+    Small HTTP client shared by the Streamlit UIs.
+
+    Keeps one pooled requests.Session per server plus a local response cache
+    keyed by path and query. Cached GET responses are reused while they are
+    fresh (Cache-Control: max-age) and revalidated with If-None-Match once
+    they go stale, so a Streamlit rerun usually costs no traffic at all.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 5, max_entries: int = 128):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._cache = {}  # (path, params) -> {"data", "etag", "expires_at"}
+        self._lock = threading.Lock()
+
+    def _key(self, path, params):
+        return path, tuple(sorted((params or {}).items()))
+
+    def _store(self, key, response, data):
+        """Remember a response according to its caching headers"""
+        cache_control = response.headers.get("Cache-Control", "")
+        directives = [d.strip().lower() for d in cache_control.split(",")]
+        if "no-store" in directives:
+            return
+        max_age = 0
+        if "no-cache" not in directives:
+            for directive in directives:
+                if directive.startswith("max-age="):
+                    try:
+                        max_age = int(directive.split("=", 1)[1])
+                    except ValueError:
+                        max_age = 0
+        etag = response.headers.get("ETag")
+        if max_age <= 0 and not etag:
+            return  # Nothing we could reuse or revalidate later
+        with self._lock:
+            self._cache.pop(key, None)
+            if len(self._cache) >= self.max_entries:
+                self._cache.pop(next(iter(self._cache)))  # Drop the oldest entry
+            self._cache[key] = {
+                "data": data,
+                "etag": etag,
+                "expires_at": time.monotonic() + max_age,
+            }
+
+    def get_json(self, path: str, params: dict = None, timeout: float = None):
+        """
+        GET a JSON resource, served from the local cache when possible.
+        Raises requests exceptions (including HTTPError for non-2xx) like a plain request would.
+        """
+        key = self._key(path, params)
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is not None and time.monotonic() < entry["expires_at"]:
+            return entry["data"]
+
+        headers = {}
+        if entry is not None and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        response = self.session.get(
+            f"{self.base_url}{path}",
+            params=params,
+            headers=headers,
+            timeout=timeout or self.timeout,
+        )
+        if response.status_code == 304 and entry is not None:
+            data = entry["data"]
+        else:
+            response.raise_for_status()
+            data = response.json()
+        self._store(key, response, data)
+        return data
+
+    def post(self, path: str, json=None, timeout: float = None):
+        """POST over the pooled session; responses are never cached"""
+        return self.session.post(
+            f"{self.base_url}{path}",
+            json=json,
+            timeout=timeout or self.timeout,
+        )
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,340 @@
+"""
+Packed, memory-mapped text corpus used as the servers' offline fallback.
+
+File layout (all sections 8-byte aligned, native byte order recorded in the TOC):
+
+    b"MCPCORP1"                 magic
+    uint64                      length of the TOC
+    TOC                         UTF-8 JSON: entry count, section locations, categories
+    offsets    uint64[N + 1]    entry i is blob[offsets[i]:offsets[i + 1]]
+    per category:
+        index  uint32[n]        entry ids belonging to the category
+        prob   float64[n]       alias-method tables, only when weights were given
+        alias  uint32[n]
+    all categories:
+        prob   float64[N]       (weighted corpora only)
+        alias  uint32[N]
+    blob                        concatenated UTF-8 texts
+
+Opening a corpus only parses the header and TOC; every array is a memoryview
+over the mmap, so load time and resident memory don't grow with corpus size.
+Uniform and weighted (Vose alias method) sampling are both O(1).
+
+Build a corpus from JSON Lines records ({"category", "text", optional "weight"}):
+
+    python packed_corpus.py pack facts.jsonl facts.corpus
+"""
+import argparse
+import json
+import logging
+import math
+import mmap
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+MAGIC = b"MCPCORP1"
+ALIGNMENT = 8
+
+logger = logging.getLogger(__name__)
+
+
+def build_alias(weights):
+    """Build Vose alias tables (prob, alias) for O(1) weighted sampling"""
+    n = len(weights)
+    total = sum(weights)
+    if n == 0 or total <= 0:
+        raise ValueError("alias tables need at least one positive weight")
+    prob = array("d", (w * n / total for w in weights))
+    alias = array("I", bytes(4 * n))
+    small = array("I", (i for i in range(n) if prob[i] < 1.0))
+    large = array("I", (i for i in range(n) if prob[i] >= 1.0))
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        alias[s] = l
+        prob[l] = prob[l] + prob[s] - 1.0
+        (small if prob[l] < 1.0 else large).append(l)
+    # Whatever is left is 1.0 up to rounding error
+    for i in large:
+        prob[i] = 1.0
+    for i in small:
+        prob[i] = 1.0
+    return prob, alias
+
+
+def write_corpus(path, records):
+    """
+    Pack (category, text, weight) records into a corpus file at path.
+    Texts must not be blank; weight may be None (treated as 1.0) and must otherwise be finite and >= 0;
+    alias tables are only written if any weight differs from 1.0, in which
+    case every category needs at least one positive weight. Texts are
+    streamed to a temporary file, so only the fixed-width arrays are held in
+    memory. The file is written beside path and renamed into place, so an
+    interrupted pack never leaves a partial corpus where a server loads it.
+    """
+    offsets = array("Q", [0])
+    entry_category = array("I")
+    weights = array("d")
+    category_ids = {}
+    weighted = False
+
+    with tempfile.TemporaryFile() as blob:
+        position = 0
+        for category, text, weight in records:
+            if not text.strip():
+                raise ValueError(f"blank text for entry {len(weights)} ({category!r})")
+            data = text.encode("utf-8")
+            blob.write(data)
+            position += len(data)
+            offsets.append(position)
+            entry_category.append(category_ids.setdefault(category, len(category_ids)))
+            weight = 1.0 if weight is None else float(weight)
+            if not (math.isfinite(weight) and weight >= 0):
+                raise ValueError(f"invalid weight {weight!r} for entry {len(weights)} ({category!r})")
+            weighted = weighted or weight != 1.0
+            weights.append(weight)
+
+        indexes = [array("I") for _ in category_ids]
+        for entry, category_id in enumerate(entry_category):
+            indexes[category_id].append(entry)
+
+        # Each section is (TOC dict, key, array); the TOC entry records
+        # [file position, length, typecode]
+        toc = {
+            "count": len(weights),
+            "weighted": weighted,
+            "byteorder": sys.byteorder,
+            "categories": {},
+            "all": {},
+        }
+        sections = [(toc, "offsets", offsets)]
+        for name, category_id in category_ids.items():
+            index = indexes[category_id]
+            category = toc["categories"][name] = {"count": len(index)}
+            sections.append((category, "index", index))
+            if weighted:
+                category_weights = [weights[i] for i in index]
+                if not any(category_weights):
+                    raise ValueError(f"category {name!r} has no positive weights, so it can't be sampled by weight")
+                prob, alias = build_alias(category_weights)
+                sections += [(category, "prob", prob), (category, "alias", alias)]
+        if weighted:
+            prob, alias = build_alias(weights)
+            sections += [(toc["all"], "prob", prob), (toc["all"], "alias", alias)]
+
+        # Section positions depend on the TOC length and vice versa; iterate until stable
+        toc_bytes = b""
+        while True:
+            cursor = _align(len(MAGIC) + 8 + len(toc_bytes))
+            for owner, key, values in sections:
+                owner[key] = [cursor, len(values), values.typecode]
+                cursor = _align(cursor + len(values) * values.itemsize)
+            toc["blob"] = [cursor, position, "B"]
+            encoded = json.dumps(toc, separators=(",", ":")).encode("utf-8")
+            if encoded == toc_bytes:
+                break
+            toc_bytes = encoded
+
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile(dir=directory, prefix=".corpus-", delete=False) as out:
+            try:
+                out.write(MAGIC)
+                out.write(struct.pack("<Q", len(toc_bytes)))
+                out.write(toc_bytes)
+                for owner, key, values in sections:
+                    _pad_to(out, owner[key][0])
+                    values.tofile(out)
+                _pad_to(out, toc["blob"][0])
+                blob.seek(0)
+                shutil.copyfileobj(blob, out)
+                out.flush()
+                os.fsync(out.fileno())
+            except BaseException:
+                out.close()
+                os.unlink(out.name)
+                raise
+        os.replace(out.name, path)
+    return len(weights)
+
+
+def _align(position):
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _pad_to(out, position):
+    out.write(bytes(position - out.tell()))
+
+
+class PackedCorpus:
+    """
+    Read-only view of a packed corpus file.
+    Use category=None to sample across all categories.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty, not a packed corpus")
+        if hasattr(mmap, "MADV_RANDOM"):
+            # Sampling touches scattered pages; readahead would only inflate RSS
+            self._mm.madvise(mmap.MADV_RANDOM)
+        try:
+            self._load()
+        except Exception:
+            self.close()
+            raise
+
+    def _load(self):
+        header_length = len(MAGIC) + 8
+        if len(self._mm) < header_length or self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a packed corpus")
+        (toc_length,) = struct.unpack_from("<Q", self._mm, len(MAGIC))
+        if header_length + toc_length > len(self._mm):
+            raise ValueError(f"{self.path} is truncated (table of contents)")
+        toc = json.loads(self._mm[header_length:header_length + toc_length])
+        if toc["byteorder"] != sys.byteorder:
+            raise ValueError(f"{self.path} was packed on a {toc['byteorder']}-endian machine")
+
+        self._views = []
+        self._view = memoryview(self._mm)
+        self.count = toc["count"]
+        self.weighted = toc["weighted"]
+        self.categories = {name: info["count"] for name, info in toc["categories"].items()}
+        self._offsets = self._section("offsets", toc["offsets"], "Q", self.count + 1)
+        self._tables = {
+            name: (self._section(f"{name!r} index", info["index"], "I", info["count"]),)
+            + self._alias_tables(name, info, info["count"])
+            for name, info in toc["categories"].items()
+        }
+        self._tables[None] = (None,) + self._alias_tables("all", toc["all"], self.count)
+
+        # Every entry must lie inside the blob, and the blob inside the file
+        self._blob_start, blob_length, _ = toc["blob"]
+        if self._offsets[0] != 0 or self._offsets[self.count] != blob_length:
+            raise ValueError(f"{self.path} is corrupt (offsets don't match the blob)")
+        if self._blob_start + blob_length > len(self._mm):
+            raise ValueError(f"{self.path} is truncated (blob)")
+
+    def _section(self, name, location, typecode, expected_length):
+        """Map one array section, checking it is what the TOC promises and fits in the file"""
+        start, length, stored_typecode = location
+        if stored_typecode != typecode or length != expected_length:
+            raise ValueError(f"{self.path} is corrupt ({name} section)")
+        end = start + length * array(typecode).itemsize
+        if start < 0 or end > len(self._mm):
+            raise ValueError(f"{self.path} is truncated ({name} section)")
+        view = self._view[start:end].cast(typecode)
+        self._views.append(view)
+        return view
+
+    def _alias_tables(self, name, info, expected_length):
+        if not self.weighted:
+            return None, None
+        return (
+            self._section(f"{name} prob", info["prob"], "d", expected_length),
+            self._section(f"{name} alias", info["alias"], "I", expected_length),
+        )
+
+    def __len__(self):
+        return self.count
+
+    def get(self, entry: int) -> str:
+        start = self._blob_start + self._offsets[entry]
+        end = self._blob_start + self._offsets[entry + 1]
+        return str(self._mm[start:end], "utf-8")
+
+    def sample(self, category: str = None, weighted: bool = False, rng=random) -> str:
+        """Draw one entry uniformly (or by weight) from category, or from all entries"""
+        index, prob, alias = self._tables[category]
+        size = self.count if index is None else len(index)
+        if size == 0:
+            raise IndexError("cannot sample from an empty corpus")
+        position = rng.randrange(size)
+        if weighted:
+            if prob is None:
+                raise ValueError(f"{self.path} was packed without weights")
+            if rng.random() >= prob[position]:
+                position = alias[position]
+        return self.get(position if index is None else index[position])
+
+    def sample_distinct(self, category: str, count: int, rng=random) -> list:
+        """
+        Draw up to count distinct entries from category (None for all), by
+        weight when the corpus has weights. Unknown or empty categories give [].
+        """
+        if category is not None and category not in self.categories:
+            return []
+        size = self.count if category is None else self.categories[category]
+        if size == 0:
+            return []
+        draws = (self.sample(category, self.weighted, rng) for _ in range(count))
+        return list(dict.fromkeys(draws))
+
+    def close(self):
+        # Views over the mmap must be released before it can be closed
+        for view in getattr(self, "_views", []):
+            view.release()
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_corpus(path):
+    """Open the corpus at path, logging and returning None if it can't be read"""
+    try:
+        corpus = PackedCorpus(path)
+    except Exception as e:
+        logger.error(f"Failed to load corpus {path}: {str(e)}")
+        return None
+    logger.info(f"Loaded {len(corpus)} entries from {path}")
+    return corpus
+
+
+def read_jsonl(path):
+    """Yield (category, text, weight) records from a JSON Lines file"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield record["category"], record["text"], record.get("weight")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect packed corpus files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="pack a JSON Lines file into a corpus")
+    pack.add_argument("source", help='JSON Lines with {"category", "text", optional "weight"}')
+    pack.add_argument("output")
+    info = commands.add_parser("info", help="show corpus categories and counts")
+    info.add_argument("corpus")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        count = write_corpus(args.output, read_jsonl(args.source))
+        print(f"Packed {count} entries into {args.output}")
+    else:
+        with PackedCorpus(args.corpus) as corpus:
+            print(f"{corpus.path}: {len(corpus)} entries, weighted={corpus.weighted}")
+            for name, count in corpus.categories.items():
+                print(f"  {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
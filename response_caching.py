@@ -0,0 +1,56 @@
+"""
+Helpers shared by the MCP servers for serving precomputed JSON bodies
+with ETag / Cache-Control validators.
+"""
+import hashlib
+import json
+
+from fastapi import Request, Response
+
+# orjson is much faster than the stdlib encoder; fall back if it isn't installed
+try:
+    import orjson
+
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag for a serialized body"""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """Check an If-None-Match header value against our (strong) ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def precomputed_response(cache: dict, key, build_payload):
+    """Return (body, etag) for key from cache, serializing build_payload() only on a miss"""
+    entry = cache.get(key)
+    if entry is None:
+        body = dumps(build_payload())
+        entry = (body, etag_for(body))
+        cache[key] = entry
+    return entry
+
+
+def conditional_json_response(request: Request, body: bytes, etag: str, cache_control: str):
+    """Serve a precomputed JSON body with ETag/Cache-Control, or 304 if the client copy is still valid"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def json_response(payload) -> Response:
+    """Serialize payload with the fast encoder, bypassing FastAPI's jsonable_encoder"""
+    return Response(content=dumps(payload), media_type="application/json")
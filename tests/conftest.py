@@ -0,0 +1,20 @@
+import importlib.util
+import itertools
+import os
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_module_ids = itertools.count()
+
+
+@pytest.fixture
+def load_server():
+    """Import a fresh copy of a server module, e.g. load_server("Joke-Generator-MCP/mcp_server.py")"""
+    def load(relative_path):
+        name = f"server_under_test_{next(_module_ids)}"
+        spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_ROOT, relative_path))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+    return load
@@ -0,0 +1,134 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cached_client
+from cached_client import CachedClient
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise cached_client.requests.HTTPError(f"{self.status_code} error")
+
+    def json(self):
+        return self.data
+
+
+class StubSession:
+    """Answers GETs from a queue of responses and records the requests"""
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append({"url": url, "params": params, "headers": headers})
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cached_client.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def client(clock):
+    client = CachedClient("http://server/", max_entries=3)
+    client.session = StubSession()
+    return client
+
+
+def test_serves_from_cache_while_fresh(client, clock):
+    client.session.responses.append(FakeResponse(data={"n": 1}, headers={"Cache-Control": "max-age=60", "ETag": '"a"'}))
+    assert client.get_json("/categories") == {"n": 1}
+    clock[0] += 59
+    assert client.get_json("/categories") == {"n": 1}
+    assert len(client.session.requests) == 1
+    assert client.session.requests[0]["url"] == "http://server/categories"
+
+
+def test_revalidates_when_stale(client, clock):
+    client.session.responses += [
+        FakeResponse(data={"n": 1}, headers={"Cache-Control": "max-age=60", "ETag": '"a"'}),
+        FakeResponse(304, headers={"Cache-Control": "max-age=60", "ETag": '"a"'}),
+        FakeResponse(data={"n": 2}, headers={"Cache-Control": "max-age=60", "ETag": '"b"'}),
+    ]
+    client.get_json("/categories")
+    clock[0] += 61
+    assert client.get_json("/categories") == {"n": 1}
+    assert client.session.requests[1]["headers"] == {"If-None-Match": '"a"'}
+    clock[0] += 61
+    assert client.get_json("/categories") == {"n": 2}
+    assert client.session.requests[2]["headers"] == {"If-None-Match": '"a"'}
+
+
+def test_304_refreshes_expiry_from_its_headers(client, clock):
+    client.session.responses += [
+        FakeResponse(data={"n": 1}, headers={"Cache-Control": "max-age=10", "ETag": '"a"'}),
+        FakeResponse(304, headers={"Cache-Control": "max-age=100", "ETag": '"a"'}),
+    ]
+    client.get_json("/categories")
+    clock[0] += 11
+    client.get_json("/categories")
+    clock[0] += 99
+    assert client.get_json("/categories") == {"n": 1}
+    assert len(client.session.requests) == 2
+
+
+def test_no_cache_revalidates_every_time(client):
+    client.session.responses += [
+        FakeResponse(data={"status": "healthy"}, headers={"Cache-Control": "no-cache", "ETag": '"h"'}),
+        FakeResponse(304, headers={"Cache-Control": "no-cache", "ETag": '"h"'}),
+    ]
+    assert client.get_json("/health") == {"status": "healthy"}
+    assert client.get_json("/health") == {"status": "healthy"}
+    assert client.session.requests[1]["headers"] == {"If-None-Match": '"h"'}
+
+
+def test_no_store_is_not_cached(client):
+    client.session.responses += [
+        FakeResponse(data={"n": 1}, headers={"Cache-Control": "no-store", "ETag": '"a"'}),
+        FakeResponse(data={"n": 2}, headers={"Cache-Control": "no-store"}),
+    ]
+    assert client.get_json("/health") == {"n": 1}
+    assert client.get_json("/health") == {"n": 2}
+    assert client.session.requests[1]["headers"] == {}
+
+
+def test_params_are_part_of_the_key(client):
+    client.session.responses += [
+        FakeResponse(data={"city": "Oslo"}, headers={"Cache-Control": "max-age=60"}),
+        FakeResponse(data={"city": "Lima"}, headers={"Cache-Control": "max-age=60"}),
+    ]
+    assert client.get_json("/weather", params={"city": "Oslo"}) == {"city": "Oslo"}
+    assert client.get_json("/weather", params={"city": "Lima"}) == {"city": "Lima"}
+    assert client.get_json("/weather", params={"city": "Oslo"}) == {"city": "Oslo"}
+    assert len(client.session.requests) == 2
+
+
+def test_evicts_oldest_at_max_entries(client):
+    for city in ["a", "b", "c", "d"]:
+        client.session.responses.append(FakeResponse(data={"city": city}, headers={"Cache-Control": "max-age=60"}))
+        client.get_json("/weather", params={"city": city})
+    assert len(client._cache) == 3
+    assert [params for _, params in client._cache] == [(("city", "b"),), (("city", "c"),), (("city", "d"),)]
+    client.session.responses.append(FakeResponse(data={"city": "a"}, headers={"Cache-Control": "max-age=60"}))
+    client.get_json("/weather", params={"city": "a"})
+    assert len(client.session.requests) == 5
+
+
+def test_http_errors_are_raised_and_not_cached(client):
+    client.session.responses += [FakeResponse(503), FakeResponse(data={"ok": True}, headers={"Cache-Control": "max-age=60"})]
+    with pytest.raises(cached_client.requests.HTTPError):
+        client.get_json("/health")
+    assert client.get_json("/health") == {"ok": True}
@@ -0,0 +1,171 @@
+import collections
+import math
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import packed_corpus
+from packed_corpus import PackedCorpus, build_alias, open_corpus, write_corpus
+
+RECORDS = [
+    ("science", "A teaspoon of neutron star weighs about 6 billion tons.", 1.0),
+    ("science", "Café au lait — ünïcödé survives the round trip.", 3.0),
+    ("animal", "Octopuses have three hearts.", 2.0),
+    ("animal", "Cows have best friends.", 2.0),
+    ("history", "Zanzibar surrendered after 38 minutes.", 4.0),
+]
+
+
+def implied_probabilities(prob, alias):
+    """Exact distribution encoded by alias tables"""
+    n = len(prob)
+    result = [p / n for p in prob]
+    for i in range(n):
+        result[alias[i]] += (1.0 - prob[i]) / n
+    return result
+
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    path = tmp_path / "test.corpus"
+    write_corpus(str(path), RECORDS)
+    return str(path)
+
+
+def test_round_trip(corpus_path):
+    with PackedCorpus(corpus_path) as corpus:
+        assert len(corpus) == len(RECORDS)
+        assert corpus.weighted
+        assert corpus.categories == {"science": 2, "animal": 2, "history": 1}
+        assert [corpus.get(i) for i in range(len(corpus))] == [text for _, text, _ in RECORDS]
+
+
+def test_category_sampling_stays_in_category(corpus_path):
+    rng = random.Random(1)
+    with PackedCorpus(corpus_path) as corpus:
+        for category in corpus.categories:
+            expected = {text for name, text, _ in RECORDS if name == category}
+            assert {corpus.sample(category, rng=rng) for _ in range(200)} == expected
+
+
+@pytest.mark.parametrize("weights", [
+    [1.0],
+    [1.0, 3.0],
+    [0.0, 5.0, 1.0, 0.5],
+    [random.Random(7).random() for _ in range(100)],
+])
+def test_alias_tables_encode_weights_exactly(weights):
+    prob, alias = build_alias(weights)
+    total = sum(weights)
+    for got, weight in zip(implied_probabilities(prob, alias), weights):
+        assert math.isclose(got, weight / total, abs_tol=1e-12)
+
+
+def test_weighted_sampling_distribution(corpus_path):
+    rng = random.Random(42)
+    draws = 40000
+    with PackedCorpus(corpus_path) as corpus:
+        counts = collections.Counter(corpus.sample(None, weighted=True, rng=rng) for _ in range(draws))
+        science = collections.Counter(corpus.sample("science", weighted=True, rng=rng) for _ in range(draws))
+    total = sum(weight for _, _, weight in RECORDS)
+    for _, text, weight in RECORDS:
+        assert counts[text] / draws == pytest.approx(weight / total, abs=0.01)
+    assert science[RECORDS[1][1]] / draws == pytest.approx(0.75, abs=0.01)
+
+
+def test_uniform_sampling_distribution(corpus_path):
+    rng = random.Random(3)
+    draws = 40000
+    with PackedCorpus(corpus_path) as corpus:
+        counts = collections.Counter(corpus.sample(rng=rng) for _ in range(draws))
+    for _, text, _ in RECORDS:
+        assert counts[text] / draws == pytest.approx(1 / len(RECORDS), abs=0.01)
+
+
+def test_unweighted_corpus(tmp_path):
+    path = str(tmp_path / "plain.corpus")
+    write_corpus(path, [("a", "x", None), ("a", "y", 1.0)])
+    with PackedCorpus(path) as corpus:
+        assert not corpus.weighted
+        assert corpus.sample("a") in {"x", "y"}
+        with pytest.raises(ValueError):
+            corpus.sample("a", weighted=True)
+
+
+@pytest.mark.parametrize("weight", [float("nan"), float("inf"), -1.0, "nan"])
+def test_invalid_weights_are_rejected(tmp_path, weight):
+    with pytest.raises(ValueError, match="invalid weight"):
+        write_corpus(str(tmp_path / "bad.corpus"), [("a", "x", 1.0), ("b", "y", weight)])
+
+
+def test_zero_weight_category_is_named(tmp_path):
+    records = [("a", "x", 1.0), ("b", "y", 0.0), ("b", "z", 0.0)]
+    with pytest.raises(ValueError, match="'b'"):
+        write_corpus(str(tmp_path / "zero.corpus"), records)
+
+
+@pytest.mark.parametrize("text", ["", "   ", "\n"])
+def test_blank_texts_are_rejected(tmp_path, text):
+    with pytest.raises(ValueError, match="blank text"):
+        write_corpus(str(tmp_path / "blank.corpus"), [("a", "x", None), ("a", text, None)])
+
+
+def test_failed_pack_leaves_existing_corpus_untouched(corpus_path):
+    with open(corpus_path, "rb") as f:
+        original = f.read()
+
+    def records():
+        yield ("a", "x", None)
+        raise RuntimeError("source went away")
+
+    with pytest.raises(RuntimeError):
+        write_corpus(corpus_path, records())
+    with open(corpus_path, "rb") as f:
+        assert f.read() == original
+    assert os.listdir(os.path.dirname(corpus_path)) == ["test.corpus"]
+
+
+def test_interrupted_write_leaves_no_partial_file(corpus_path, monkeypatch):
+    with open(corpus_path, "rb") as f:
+        original = f.read()
+
+    def interrupted_copy(source, destination):
+        destination.write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(packed_corpus.shutil, "copyfileobj", interrupted_copy)
+    with pytest.raises(OSError):
+        write_corpus(corpus_path, RECORDS)
+    with open(corpus_path, "rb") as f:
+        assert f.read() == original
+    assert os.listdir(os.path.dirname(corpus_path)) == ["test.corpus"]
+
+
+def test_sample_distinct(corpus_path):
+    with PackedCorpus(corpus_path) as corpus:
+        drawn = corpus.sample_distinct("science", 50, rng=random.Random(5))
+        assert sorted(drawn) == sorted(text for name, text, _ in RECORDS if name == "science")
+        assert len(corpus.sample_distinct(None, 3)) <= 3
+        assert corpus.sample_distinct("missing", 5) == []
+
+
+def test_open_corpus_rejects_bad_files(tmp_path):
+    garbage = tmp_path / "garbage.corpus"
+    garbage.write_bytes(b"not a corpus at all")
+    empty = tmp_path / "empty.corpus"
+    empty.write_bytes(b"")
+    assert open_corpus(str(garbage)) is None
+    assert open_corpus(str(empty)) is None
+    assert open_corpus(str(tmp_path / "missing.corpus")) is None
+
+
+def test_truncated_corpus_is_rejected(corpus_path, tmp_path):
+    with open(corpus_path, "rb") as f:
+        data = f.read()
+    truncated = tmp_path / "truncated.corpus"
+    for length in range(len(data)):
+        truncated.write_bytes(data[:length])
+        assert open_corpus(str(truncated)) is None, f"accepted a corpus cut at {length} bytes"
@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from response_caching import etag_matches
+
+SERVERS = ["Joke-Generator-MCP/mcp_server.py", "FunFact-Generator-MCP/mcp_server.py"]
+ETAG = '"0123abcd"'
+
+
+@pytest.mark.parametrize("header, expected", [
+    (ETAG, True),
+    (f"W/{ETAG}", True),
+    ("*", True),
+    (f'"other", {ETAG}', True),
+    (f'"other", W/{ETAG}', True),
+    ('"other"', False),
+    ("0123abcd", False),
+    ("", False),
+    (None, False),
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, ETAG) is expected
+
+
+@pytest.fixture(params=SERVERS)
+def client(request, load_server):
+    return TestClient(load_server(request.param).app)
+
+
+@pytest.mark.parametrize("path", ["/health", "/categories"])
+@pytest.mark.parametrize("if_none_match", ["{etag}", "W/{etag}", "*", '"stale", {etag}'])
+def test_matching_if_none_match_gets_304(client, path, if_none_match):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    again = client.get(path, headers={"If-None-Match": if_none_match.format(etag=etag)})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert again.headers["cache-control"] == first.headers["cache-control"]
+
+
+def test_stale_etag_gets_full_body(client):
+    first = client.get("/categories")
+    again = client.get("/categories", headers={"If-None-Match": '"stale"'})
+    assert again.status_code == 200
+    assert again.json() == first.json()
+
+
+def test_cache_control(client):
+    assert client.get("/health").headers["cache-control"] == "no-cache"
+    assert client.get("/categories").headers["cache-control"] == "max-age=1800"
+
+
+class UpstreamResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+@pytest.mark.parametrize("path, fetch, cache, data", [
+    ("Joke-Generator-MCP/mcp_server.py", "fetch_jokes_from_api", "joke_cache", {"joke": "A brand new joke."}),
+    ("FunFact-Generator-MCP/mcp_server.py", "fetch_facts_from_source", "fact_cache", {"text": "A brand new fact."}),
+])
+def test_refresh_invalidates_health(load_server, monkeypatch, path, fetch, cache, data):
+    server = load_server(path)
+    client = TestClient(server.app)
+    monkeypatch.setattr(server.requests, "get", lambda *args, **kwargs: UpstreamResponse(data))
+    before = client.get("/health")
+    category = next(iter(getattr(server, cache)))
+    assert getattr(server, fetch)(category)
+    after = client.get("/health", headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200
+    assert after.headers["etag"] != before.headers["etag"]
+    assert after.json()["cache_counts"] != before.json()["cache_counts"]
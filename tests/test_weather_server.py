@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("mcp.server.fastmcp")
+from fastapi.testclient import TestClient
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+@pytest.fixture
+def weather(load_server, monkeypatch):
+    server = load_server("WeatherApp-Report-MCP/weather_server.py")
+    queries = []
+
+    def fake_get(url, params=None, **kwargs):
+        queries.append(params["q"])
+        # OpenWeatherMap answers with its own canonical spelling
+        name = {"winston-salem": "Winston-Salem", "mcallen": "McAllen"}.get(params["q"].casefold(), params["q"])
+        return FakeResponse({"name": name, "main": {"temp": 21.0}, "weather": [{"description": "clear sky"}]})
+
+    monkeypatch.setattr(server.requests, "get", fake_get)
+    return server, TestClient(server.app), queries
+
+
+def test_city_names_come_from_upstream(weather):
+    server, client, queries = weather
+    assert client.get("/weather", params={"city": " winston-salem "}).json()["city"] == "Winston-Salem"
+    assert client.get("/weather", params={"city": "McAllen"}).json()["city"] == "McAllen"
+    assert client.get("/weather", params={"city": "washington, d.c."}).json()["city"] == "washington, d.c."
+    assert queries == ["winston-salem", "McAllen", "washington, d.c."]
+
+
+def test_spellings_of_one_city_share_a_cache_entry(weather):
+    server, client, queries = weather
+    bodies = {client.get("/weather", params={"city": city}).content for city in ["MCALLEN", "mcallen", "  McAllen "]}
+    assert len(bodies) == 1
+    assert queries == ["MCALLEN"]
+
+
+def test_weather_conditional_response(weather):
+    server, client, queries = weather
+    first = client.get("/weather", params={"city": "McAllen"})
+    assert first.headers["cache-control"].startswith("max-age=")
+    again = client.get("/weather", params={"city": "McAllen"}, headers={"If-None-Match": first.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_city_cache_is_bounded(weather, monkeypatch):
+    server, client, queries = weather
+    monkeypatch.setattr(server, "MAX_CACHED_CITIES", 3)
+    for city in ["a", "b", "c", "d"]:
+        client.get("/weather", params={"city": city})
+    assert list(server.mcp.cache) == ["b", "c", "d"]
+
+
+def test_expired_cities_are_dropped_first(weather, monkeypatch):
+    server, client, queries = weather
+    monkeypatch.setattr(server, "MAX_CACHED_CITIES", 3)
+    for city in ["a", "b", "c"]:
+        client.get("/weather", params={"city": city})
+    server.mcp.cache["b"]["last_updated"] -= server.CACHE_EXPIRY * 2
+    client.get("/weather", params={"city": "d"})
+    assert list(server.mcp.cache) == ["a", "c", "d"]